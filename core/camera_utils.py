@@ -0,0 +1,281 @@
+# core/camera_utils.py
+
+"""
+Helpers for working with local (OpenCV) cameras:
+- Probe several device indices in parallel, each with its own timeout.
+- Report resolution and achievable fps per device.
+- Capture from several devices at once on separate threads, stamping every
+  frame with a shared monotonic clock so frames can be paired by timestamp
+  (e.g. for two-view tremor measurement).
+"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+import threading
+import time
+
+from core import config
+
+
+def probe_camera(index: int, num_frames: int = config.CAMERA_PROBE_FPS_FRAMES) -> Dict:
+    """Open a single camera index and measure what it can deliver.
+
+    Returns a dict with:
+    - "index": the device index
+    - "ok": True if frames could be read
+    - "width", "height": frame size of the first frame (0 if not ok)
+    - "fps": frames per second achieved while reading `num_frames` frames
+    - "frame": the first frame read (BGR ndarray) or None
+    - "error": short description when not ok
+    """
+    import cv2
+
+    info = {
+        "index": index,
+        "ok": False,
+        "width": 0,
+        "height": 0,
+        "fps": 0.0,
+        "frame": None,
+        "error": "",
+    }
+
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            info["error"] = "not opened"
+            return info
+
+        # The first read also waits for the device to warm up, so it is not
+        # included in the fps estimate.
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            info["error"] = "opened but failed to read frame"
+            return info
+
+        h, w = frame.shape[:2]
+        info["width"] = w
+        info["height"] = h
+        info["frame"] = frame
+
+        read = 0
+        start = time.monotonic()
+        for _ in range(max(0, num_frames)):
+            ret, _ = cap.read()
+            if not ret:
+                break
+            read += 1
+        elapsed = time.monotonic() - start
+        info["fps"] = read / elapsed if elapsed > 0 else 0.0
+        info["ok"] = True
+        return info
+    finally:
+        cap.release()
+
+
+def discover_cameras(
+    indices: Optional[List[int]] = None,
+    timeout: float = config.CAMERA_PROBE_TIMEOUT_SECONDS,
+    num_frames: int = config.CAMERA_PROBE_FPS_FRAMES,
+) -> List[Dict]:
+    """Probe all camera indices in parallel.
+
+    Each index is probed on its own daemon thread. Devices that have not
+    answered within `timeout` seconds (measured from the start of discovery,
+    not per device) are reported with error "timed out"; their threads are
+    left to finish in the background so a hung driver never blocks startup.
+
+    Returns one info dict per index (see `probe_camera`), in index order.
+    """
+    if indices is None:
+        indices = config.CAMERA_PROBE_INDICES
+
+    results: Dict[int, Dict] = {}
+    lock = threading.Lock()
+
+    def _worker(idx: int) -> None:
+        try:
+            info = probe_camera(idx, num_frames=num_frames)
+        except Exception as exc:  # e.g. backend errors on exotic devices
+            info = {
+                "index": idx, "ok": False, "width": 0, "height": 0,
+                "fps": 0.0, "frame": None, "error": str(exc),
+            }
+        with lock:
+            results[idx] = info
+
+    threads = []
+    for idx in indices:
+        th = threading.Thread(target=_worker, args=(idx,), daemon=True)
+        th.start()
+        threads.append(th)
+
+    deadline = time.monotonic() + timeout
+    for th in threads:
+        th.join(max(0.0, deadline - time.monotonic()))
+
+    report = []
+    with lock:
+        for idx in indices:
+            info = results.get(idx)
+            if info is None:
+                info = {
+                    "index": idx, "ok": False, "width": 0, "height": 0,
+                    "fps": 0.0, "frame": None, "error": "timed out",
+                }
+            report.append(info)
+    return report
+
+
+class MultiCameraCapture:
+    """Grab frames from several cameras on separate threads.
+
+    Every frame is stamped with `time.monotonic()` right after `read()`
+    returns, so all devices share one clock. A short buffer of recent frames
+    is kept per device; `read_synchronized` pairs them by timestamp.
+
+    Usage
+    -----
+    with MultiCameraCapture([0, 1]) as cams:
+        frames = cams.read_synchronized()
+        if frames is not None:
+            (t0, img0), (t1, img1) = frames[0], frames[1]
+    """
+
+    def __init__(
+        self,
+        indices: List[int],
+        tolerance: float = config.CAMERA_SYNC_TOLERANCE_SECONDS,
+        buffer_size: int = 8,
+    ):
+        self.indices = list(indices)
+        self.tolerance = tolerance
+        self._caps = {}
+        self._threads: List[threading.Thread] = []
+        self._buffers: Dict[int, Deque[Tuple[float, object]]] = {
+            idx: deque(maxlen=buffer_size) for idx in self.indices
+        }
+        self._last_paired: Dict[int, float] = {}
+        self._cond = threading.Condition()
+        self._running = False
+        self._stop_event: Optional[threading.Event] = None
+        self.stats = {idx: {"frames": 0, "failed_reads": 0} for idx in self.indices}
+
+    def start(self) -> "MultiCameraCapture":
+        import cv2
+
+        if self._running:
+            return self
+
+        for idx in self.indices:
+            cap = cv2.VideoCapture(idx)
+            if not cap.isOpened():
+                cap.release()
+                self._release_all()
+                raise RuntimeError(f"Camera index {idx} could not be opened")
+            self._caps[idx] = cap
+
+        self._running = True
+        self._stop_event = threading.Event()
+        for idx in self.indices:
+            th = threading.Thread(
+                target=self._grab_loop,
+                args=(idx, self._caps[idx], self._stop_event),
+                daemon=True,
+            )
+            th.start()
+            self._threads.append(th)
+        # The grab threads now own the captures.
+        self._caps = {}
+        return self
+
+    def _grab_loop(self, idx: int, cap, stop_event: threading.Event) -> None:
+        # Each thread owns its capture and releases it itself, so stop() can
+        # never release a device that is still blocked inside read().
+        try:
+            while not stop_event.is_set():
+                ret, frame = cap.read()
+                t = time.monotonic()
+                if not ret or frame is None:
+                    with self._cond:
+                        self.stats[idx]["failed_reads"] += 1
+                    time.sleep(0.005)
+                    continue
+                with self._cond:
+                    self._buffers[idx].append((t, frame))
+                    self.stats[idx]["frames"] += 1
+                    self._cond.notify_all()
+        finally:
+            cap.release()
+
+    def _paired_locked(self) -> Optional[Dict[int, Tuple[float, object]]]:
+        # Frames already handed out are never paired again.
+        fresh = {}
+        for idx in self.indices:
+            last = self._last_paired.get(idx, -1.0)
+            fresh[idx] = [item for item in self._buffers[idx] if item[0] > last]
+            if not fresh[idx]:
+                return None
+
+        # Anchor on the device whose newest frame is oldest (the slowest one)
+        # and pick the closest-in-time frame from every other device.
+        anchor_idx = min(self.indices, key=lambda i: fresh[i][-1][0])
+        t_ref = fresh[anchor_idx][-1][0]
+        paired = {}
+        for idx in self.indices:
+            item = min(fresh[idx], key=lambda it: abs(it[0] - t_ref))
+            if abs(item[0] - t_ref) > self.tolerance:
+                return None
+            paired[idx] = item
+        return paired
+
+    def read_synchronized(self, timeout: float = 1.0) -> Optional[Dict[int, Tuple[float, object]]]:
+        """Wait for a set of frames (one per camera) whose timestamps lie
+        within `tolerance` seconds of each other.
+
+        Returns a dict index -> (t_monotonic, frame), or None on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                paired = self._paired_locked()
+                if paired is not None:
+                    for idx, (t, _) in paired.items():
+                        self._last_paired[idx] = t
+                    return paired
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    return None
+                self._cond.wait(remaining)
+
+    def read_latest(self) -> Dict[int, Tuple[float, object]]:
+        """Return the most recent (t_monotonic, frame) per camera, unpaired."""
+        with self._cond:
+            return {idx: buf[-1] for idx, buf in self._buffers.items() if buf}
+
+    def stop(self) -> None:
+        """Signal the grab threads to exit and wait briefly for them.
+
+        A thread still blocked in read() after the timeout is left to finish
+        on its own; it releases its capture when read() returns.
+        """
+        self._running = False
+        if self._stop_event is not None:
+            self._stop_event.set()
+        with self._cond:
+            self._cond.notify_all()
+        for th in self._threads:
+            th.join(timeout=1.0)
+        self._threads = []
+
+    def _release_all(self) -> None:
+        # Only used when start() fails, before any grab thread exists.
+        for cap in self._caps.values():
+            cap.release()
+        self._caps = {}
+
+    def __enter__(self) -> "MultiCameraCapture":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
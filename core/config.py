@@ -3,6 +3,51 @@
 # ---- TIMING ----
 CALIBRATION_DURATION_SECONDS = 3
 TEST_DURATION_SECONDS = 30
+LIVE_TEST_REFRESH_SECONDS = 0.5   # how often the Live Test status panel redraws
+
+# ---- LONG FATIGUE PROTOCOL (bounded memory, chunks spilled to disk) ----
+LONG_PROTOCOL_DURATION_CHOICES_MINUTES = [5, 10, 15, 20]
+LONG_PROTOCOL_WINDOW_SAMPLES = 900     # recent samples kept in memory per finger (~30 s)
+LONG_PROTOCOL_CHUNK_SAMPLES = 1800     # frames per compressed chunk file (~60 s)
+LONG_PROTOCOL_PLOT_POINTS = 3000       # max points per finger in the results plot
+
+# ---- CAMERA DISCOVERY / MULTI-CAMERA CAPTURE ----
+CAMERA_PROBE_INDICES = [0, 1, 2, 3]
+CAMERA_PROBE_TIMEOUT_SECONDS = 3.0
+CAMERA_PROBE_FPS_FRAMES = 15          # frames read per device to estimate fps
+CAMERA_SYNC_TOLERANCE_SECONDS = 0.020  # max timestamp skew for a paired frame set
+
+# ---- SESSION RECORDING (optional raw video + landmarks) ----
+RECORDINGS_DIR = "recordings"
+RECORDING_VIDEO_FPS = 30
+RECORDING_VIDEO_QUALITY = 75           # MJPEG quality, 0–100
+RECORDING_FRAME_QUEUE_SIZE = 64        # frames buffered before dropping
+RECORDING_LANDMARK_CHUNK_SIZE = 256    # landmark rows per flush
+
+# ---- ADAPTIVE QUALITY GOVERNOR ----
+# Ordered from best quality (level 0, the original fixed settings) to
+# cheapest. inference_width=None means the full camera frame is used.
+# Detection / tracking confidences stay at MediaPipe's defaults on every
+# level, so only a model_complexity change needs a new Hands instance.
+QUALITY_LEVELS = [
+    {"model_complexity": 1, "inference_width": None, "process_every_n": 1},
+    {"model_complexity": 0, "inference_width": 640, "process_every_n": 1},
+    {"model_complexity": 0, "inference_width": 480, "process_every_n": 1},
+    {"model_complexity": 0, "inference_width": 320, "process_every_n": 1},
+    {"model_complexity": 0, "inference_width": 320, "process_every_n": 2},
+]
+QUALITY_TARGET_FPS = 30
+QUALITY_LATENCY_BUDGET_MS = 1000 / QUALITY_TARGET_FPS
+QUALITY_ADJUST_INTERVAL_SECONDS = 2.0  # min time between level changes
+QUALITY_UPGRADE_HEADROOM = 0.6         # step up when latency < budget * this
+
+# ---- HAND-PRESENCE GATE (skip MediaPipe on empty / static frames) ----
+PRESENCE_GATE_ENABLED = True
+PRESENCE_GATE_SIZE = (64, 36)            # tiny frame the heuristics run on (w, h)
+PRESENCE_GATE_PIXEL_DIFF = 15            # gray-level change that counts a pixel as moving
+PRESENCE_GATE_MOTION_FRACTION = 0.01     # moving skin-tone pixels / frame area to run MediaPipe
+PRESENCE_GATE_HOLD_SECONDS = 1.0         # keep running MediaPipe this long after a detection
+PRESENCE_GATE_MAX_SKIP_SECONDS = 0.5     # always re-check with MediaPipe this often
 
 # ---- FINGERS WE TRACK ----
 FINGERS_TO_TRACK = ["THUMB", "INDEX", "MIDDLE"]
@@ -14,6 +59,11 @@ FINGER_COLORS = {
     "MIDDLE": "#E53935",  # red
 }
 
+# ---- CROSS-FINGER COORDINATION ----
+COORDINATION_RESAMPLE_HZ = 30.0
+COORDINATION_BAND_HZ = (3.0, 12.0)     # physiological tremor band
+COORDINATION_NPERSEG = 64              # Welch segment length (samples)
+
 # ---- STABILITY SCORE WEIGHTS (for AI to use in scoring.py) ----
 WEIGHT_TREMOR = 0.4
 WEIGHT_DRIFT = 0.3
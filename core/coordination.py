@@ -0,0 +1,221 @@
+# core/coordination.py
+
+"""Cross-finger coordination metrics.
+
+Every tracked finger contributes two channels (x and y). All channels are
+resampled onto one uniform time grid and then analysed together:
+
+- Pearson correlation matrix (channels x channels)
+- Magnitude-squared coherence (Welch estimate), averaged over the tremor band
+- Phase lead from the cross-spectral phase at the dominant tremor-band
+  frequency (positive lag = row channel leads column channel), plus the
+  cross-correlation at that lag
+
+All channels and all Welch segments go through a single batched FFT, so the
+cost grows with the number of channels only through the cheap
+channel-pair products. This keeps things fast from 3 fingertips up to all 21
+MediaPipe landmarks.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core import config
+
+
+def resample_channels(
+    raw_data: Dict[str, List[Tuple[float, float, float]]],
+    fs: float = config.COORDINATION_RESAMPLE_HZ,
+) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """Stack finger -> [(t, x, y), ...] into a (channels, samples) array.
+
+    Only the time span covered by every finger is kept, and channels are
+    linearly interpolated onto a uniform grid at `fs` Hz (webcam frame times
+    are irregular). Returns (labels, t_grid, data) where labels look like
+    "INDEX_x".
+    """
+    fingers = [f for f, samples in raw_data.items() if len(samples) >= 2]
+    if not fingers:
+        return [], np.zeros(0), np.zeros((0, 0))
+
+    arrays = {f: np.asarray(raw_data[f], dtype=float) for f in fingers}
+    t_start = max(a[0, 0] for a in arrays.values())
+    t_end = min(a[-1, 0] for a in arrays.values())
+    if t_end <= t_start:
+        return [], np.zeros(0), np.zeros((0, 0))
+
+    t_grid = np.arange(t_start, t_end, 1.0 / fs)
+    labels: List[str] = []
+    rows = []
+    for f in fingers:
+        a = arrays[f]
+        for axis, col in (("x", 1), ("y", 2)):
+            labels.append(f"{f}_{axis}")
+            rows.append(np.interp(t_grid, a[:, 0], a[:, col]))
+
+    return labels, t_grid, np.vstack(rows)
+
+
+def _detrend(data: np.ndarray) -> np.ndarray:
+    """Remove a per-channel linear trend (slow drift is not coordination)."""
+    n = data.shape[-1]
+    x = np.arange(n) - (n - 1) / 2.0
+    denom = float(np.dot(x, x)) or 1.0
+    slope = data @ x / denom
+    return data - data.mean(axis=-1, keepdims=True) - slope[..., None] * x
+
+
+def correlation_matrix(data: np.ndarray) -> np.ndarray:
+    """Zero-lag Pearson correlation between all channels."""
+    centered = data - data.mean(axis=1, keepdims=True)
+    norms = np.sqrt((centered * centered).sum(axis=1))
+    norms[norms < 1e-12] = np.inf  # flat channels correlate with nothing
+    return (centered @ centered.T) / np.outer(norms, norms)
+
+
+def coherence_matrix(
+    data: np.ndarray,
+    fs: float,
+    nperseg: int = config.COORDINATION_NPERSEG,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Magnitude-squared coherence for every channel pair.
+
+    Welch estimate with Hann windows and 50% overlap. All channels and
+    segments are transformed in one rfft call.
+
+    Returns (freqs, coh, csd) where coh and the complex cross-spectral
+    density csd have shape (channels, channels, freqs).
+    """
+    n_ch, n = data.shape
+    nperseg = min(nperseg, n)
+    step = max(1, nperseg // 2)
+    starts = np.arange(0, n - nperseg + 1, step)
+
+    # Gather (channels, segments, nperseg) in one indexing op, then one batched FFT.
+    idx = starts[:, None] + np.arange(nperseg)[None, :]
+    segments = data[:, idx]
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    segments = segments * np.hanning(nperseg)
+    spec = np.fft.rfft(segments, axis=-1)  # (channels, segments, freqs)
+
+    # Cross-spectral density averaged over segments: (channels, channels, freqs)
+    csd = np.einsum("isf,jsf->ijf", spec, spec.conj()) / len(starts)
+    auto = np.real(np.einsum("iif->if", csd))
+    denom = auto[:, None, :] * auto[None, :, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        coh = np.where(denom > 0, np.abs(csd) ** 2 / denom, 0.0)
+
+    freqs = np.fft.rfftfreq(nperseg, d=1.0 / fs)
+    return freqs, coh, csd
+
+
+def phase_lead(
+    csd: np.ndarray,
+    freqs: np.ndarray,
+    band: Tuple[float, float],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Phase lead between every channel pair from the cross-spectral phase.
+
+    For each pair the in-band frequency with the largest cross-spectral
+    magnitude is used, and lag = angle(csd) / (2*pi*f). csd_ij = X_i conj(X_j),
+    so a positive lag means the row channel leads the column channel.
+
+    The phase is only defined modulo one period, so the lag is reported
+    within +/- half a period of that frequency; a phase near +/-180 deg means
+    anti-phase coupling.
+
+    Returns (lag_seconds, phase_deg), both (channels, channels).
+    """
+    in_band = np.flatnonzero((freqs >= band[0]) & (freqs <= band[1]) & (freqs > 0))
+    if in_band.size == 0:
+        n_ch = csd.shape[0]
+        return np.zeros((n_ch, n_ch)), np.zeros((n_ch, n_ch))
+
+    band_csd = csd[:, :, in_band]
+    peak = np.argmax(np.abs(band_csd), axis=-1)
+    at_peak = np.take_along_axis(band_csd, peak[..., None], axis=-1)[..., 0]
+    phase = np.angle(at_peak)
+    lag_seconds = phase / (2 * np.pi * freqs[in_band][peak])
+    return lag_seconds, np.degrees(phase)
+
+
+def lagged_cross_correlation(
+    data: np.ndarray,
+    fs: float,
+    lag_seconds: np.ndarray,
+) -> np.ndarray:
+    """Normalized cross-correlation of every channel pair at a given lag.
+
+    `lag_seconds[i, j]` > 0 means channel i leads channel j; the result is
+    the correlation once i is shifted by that lag (e.g. the lags from
+    `phase_lead`). Uses one zero-padded rfft of all channels.
+    """
+    n_ch, n = data.shape
+    centered = data - data.mean(axis=1, keepdims=True)
+    norms = np.sqrt((centered * centered).sum(axis=1))
+    norms[norms < 1e-12] = np.inf
+
+    nfft = 1 << int(np.ceil(np.log2(2 * n - 1)))
+    spec = np.fft.rfft(centered, n=nfft, axis=1)
+    cross = spec[:, None, :] * spec[None, :, :].conj()
+
+    # xcorr(k) = sum_t x_i[t + k] * x_j[t] is the inverse DFT of `cross`;
+    # evaluating it directly at k = -lag * fs gives the band-limited value
+    # between samples, where rounding k would lose up to half a sample.
+    k = np.clip(-lag_seconds * fs, -(n - 1), n - 1)
+    weights = np.full(cross.shape[-1], 2.0)
+    weights[0] = 1.0
+    weights[-1] = 1.0  # nfft is even: the Nyquist bin appears once
+    bins = np.arange(cross.shape[-1])
+    xcorr = np.real(
+        (weights * cross * np.exp(2j * np.pi * bins * k[..., None] / nfft)).sum(axis=-1)
+    ) / nfft
+    return xcorr / np.outer(norms, norms)
+
+
+def compute_coordination_metrics(
+    raw_data: Dict[str, List[Tuple[float, float, float]]],
+    fs: float = config.COORDINATION_RESAMPLE_HZ,
+    band: Tuple[float, float] = config.COORDINATION_BAND_HZ,
+) -> Optional[Dict]:
+    """Compute all coordination matrices from raw finger -> [(t, x, y)] data.
+
+    Returns None when there is not enough overlapping data, otherwise a dict:
+    - "labels": channel names (e.g. "THUMB_x")
+    - "correlation": zero-lag correlation matrix
+    - "band": (low, high) Hz actually averaged over; high is capped at fs / 2
+    - "coherence": coherence averaged over that band
+    - "freqs", "coherence_spectrum": full coherence, (channels, channels, freqs)
+    - "lag_seconds", "phase_deg": phase lead at the dominant in-band
+      frequency (positive = row leads; within +/- half a period)
+    - "lag_corr": correlation once the row is shifted by that lag
+    """
+    labels, _, data = resample_channels(raw_data, fs)
+    if not labels or data.shape[1] < 8:
+        return None
+
+    data = _detrend(data)
+    freqs, coh, csd = coherence_matrix(data, fs)
+    # Frequencies above Nyquist do not exist at this sample rate; average
+    # over what is left and report the band actually used.
+    band = (band[0], min(band[1], fs / 2.0))
+    in_band = (freqs >= band[0]) & (freqs <= band[1])
+    if in_band.any():
+        band_coh = coh[:, :, in_band].mean(axis=-1)
+    else:
+        band_coh = coh.mean(axis=-1)
+    lag_seconds, phase_deg = phase_lead(csd, freqs, band)
+    lag_corr = lagged_cross_correlation(data, fs, lag_seconds)
+
+    return {
+        "labels": labels,
+        "band": band,
+        "correlation": correlation_matrix(data),
+        "coherence": band_coh,
+        "freqs": freqs,
+        "coherence_spectrum": coh,
+        "lag_seconds": lag_seconds,
+        "phase_deg": phase_deg,
+        "lag_corr": lag_corr,
+    }
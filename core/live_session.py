@@ -0,0 +1,148 @@
+# core/live_session.py
+
+"""
+State for one Live Test run, shared between the Streamlit script thread and
+the WebRTC media thread.
+
+The test is event driven: `start()` arms a deadline, and the capture pipeline
+ends the test itself the first time a frame (or a UI poll) arrives after the
+deadline. No thread sleeps for the duration of the test, so the Streamlit
+script thread is free to rerun and show progress.
+"""
+
+from typing import Dict, List, Optional, Tuple
+import threading
+import time
+
+from core import config
+
+
+class LiveTestSession:
+    def __init__(
+        self,
+        duration: float = config.TEST_DURATION_SECONDS,
+        fingers: Optional[List[str]] = None,
+        recorder=None,
+        store=None,
+    ):
+        if fingers is None:
+            fingers = config.FINGERS_TO_TRACK
+        self.duration = duration
+        self.recorder = recorder
+        # Long protocols pass a core.long_protocol.ChunkedTimeSeries; samples
+        # then go there (bounded memory) instead of raw_time_series.
+        self.store = store
+        self.raw_time_series: Dict[str, List[Tuple[float, float, float]]] = {f: [] for f in fingers}
+        # "gated" frames were skipped by the presence gate; they are also
+        # counted in "frames" as frames without landmarks.
+        self.detection_stats = {"frames": 0, "detected": 0, "gated": 0}
+        self.recording_stats: Optional[Dict[str, int]] = None
+        self.recording_path: Optional[str] = recorder.path if recorder is not None else None
+        # Index into the quality governor's decision log at start(), so only
+        # changes made during this run are reported.
+        self.quality_decision_offset = 0
+
+        self._lock = threading.Lock()
+        self._recorder_thread: Optional[threading.Thread] = None
+        self._start: Optional[float] = None
+        self._capturing = False
+        self._complete = False
+
+    def start(self) -> "LiveTestSession":
+        with self._lock:
+            self._start = time.monotonic()
+            self._capturing = True
+            self._complete = False
+        return self
+
+    @property
+    def capturing(self) -> bool:
+        return self._capturing
+
+    @property
+    def complete(self) -> bool:
+        return self._complete
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        if self._start is None:
+            return 0.0
+        if now is None:
+            now = time.monotonic()
+        return min(self.duration, now - self._start)
+
+    def poll(self, now: Optional[float] = None) -> bool:
+        """End the test if its deadline has passed. Returns True while capturing."""
+        if now is None:
+            now = time.monotonic()
+        if self._capturing and self._start is not None and now - self._start >= self.duration:
+            self.finish()
+        return self._capturing
+
+    def add_sample(self, t: float, landmarks: Optional[Dict[str, Tuple[float, float]]]) -> None:
+        """Record one processed frame; `landmarks` is None if no hand was found."""
+        with self._lock:
+            if not self._capturing:
+                return
+            self.detection_stats["frames"] += 1
+            if landmarks:
+                self.detection_stats["detected"] += 1
+                if self.store is not None:
+                    self.store.append(t, landmarks)
+                    return
+                for name, (x, y) in landmarks.items():
+                    self.raw_time_series.setdefault(name, []).append((t, x, y))
+
+    def add_gated(self, t: float) -> None:
+        """Record a frame the presence gate kept away from MediaPipe."""
+        with self._lock:
+            if not self._capturing:
+                return
+            self.detection_stats["frames"] += 1
+            self.detection_stats["gated"] += 1
+
+    def finish(self) -> None:
+        """Stop capturing and close the recorder (safe to call more than once)."""
+        with self._lock:
+            if not self._capturing:
+                return
+            self._capturing = False
+            recorder = self.recorder
+            self.recorder = None
+        if recorder is not None:
+            # finish() may run on the media thread; flushing the recorder
+            # must not hold up the frame that triggered it.
+            self._recorder_thread = threading.Thread(
+                target=self._stop_recorder, args=(recorder,), daemon=True
+            )
+            self._recorder_thread.start()
+        self._complete = True
+
+    def wait_for_recording(self, timeout: float = 10.0) -> Optional[Dict[str, int]]:
+        """Wait (script thread only) for the recorder flush; returns its stats."""
+        if self._recorder_thread is not None:
+            self._recorder_thread.join(timeout)
+        return self.recording_stats
+
+    def _stop_recorder(self, recorder) -> None:
+        self.recording_stats = recorder.stop()
+
+    def snapshot(self) -> Dict:
+        """Progress numbers for the UI."""
+        with self._lock:
+            frames = self.detection_stats["frames"]
+            detected = self.detection_stats["detected"]
+            gated = self.detection_stats["gated"]
+        elapsed = self.elapsed()
+        return {
+            "elapsed": elapsed,
+            "remaining": max(0.0, self.duration - elapsed),
+            "frames": frames,
+            "detected": detected,
+            "gated": gated,
+            "detection_rate": detected / frames * 100 if frames > 0 else 0.0,
+            # Frames let through by the quality governor (gated frames
+            # included): the sample rate the landmark series was taken at.
+            "fps": frames / elapsed if elapsed > 0 else 0.0,
+            # Frames MediaPipe actually ran on.
+            "inference_fps": (frames - gated) / elapsed if elapsed > 0 else 0.0,
+        }
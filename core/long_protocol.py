@@ -0,0 +1,221 @@
+# core/long_protocol.py
+
+"""Bounded-memory storage and analysis for long (5–20 min) fatigue protocols.
+
+`ChunkedTimeSeries` keeps only a fixed-size recent window per finger in
+memory (for live display). Every `chunk_samples` samples the older data is
+handed to a background thread that writes it as a compressed .npz file, so
+memory use does not grow with recording length and the media thread never
+waits on the disk.
+
+`compute_streaming_metrics` then reads the chunks back one at a time and
+produces the same tremor / drift / fatigue numbers as the functions in
+core.signal_processing, using O(chunk) memory instead of O(recording).
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+import glob
+import math
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+
+from core import config
+
+
+class ChunkedTimeSeries:
+    def __init__(
+        self,
+        fingers: Optional[List[str]] = None,
+        window_samples: int = config.LONG_PROTOCOL_WINDOW_SAMPLES,
+        chunk_samples: int = config.LONG_PROTOCOL_CHUNK_SAMPLES,
+        spill_dir: Optional[str] = None,
+    ):
+        if fingers is None:
+            fingers = config.FINGERS_TO_TRACK
+        if spill_dir is None:
+            spill_dir = tempfile.mkdtemp(prefix="hand_stability_")
+        else:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.spill_dir = spill_dir
+        self.window_samples = window_samples
+        self.chunk_samples = chunk_samples
+
+        self._window: Dict[str, Deque[Tuple[float, float, float]]] = {
+            f: deque(maxlen=window_samples) for f in fingers
+        }
+        self._pending: Dict[str, List[Tuple[float, float, float]]] = {f: [] for f in fingers}
+        self._pending_count = 0
+        self._n_chunks = 0
+        self._writer = ThreadPoolExecutor(max_workers=1)
+        self._closed = False
+        self.total_samples: Dict[str, int] = {f: 0 for f in fingers}
+        # Runs on cleanup(), when the store is garbage collected (e.g. its
+        # Streamlit session ends and session_state is dropped) or at exit,
+        # whichever comes first, so spill directories never outlive the app.
+        self._finalizer = weakref.finalize(self, _remove_spill, self._writer, spill_dir)
+
+    def append(self, t: float, landmarks: Dict[str, Tuple[float, float]]) -> None:
+        """Add one frame's landmarks (finger -> (x, y)) sampled at time `t`."""
+        for name, (x, y) in landmarks.items():
+            sample = (t, x, y)
+            if name not in self._window:
+                self._window[name] = deque(maxlen=self.window_samples)
+                self._pending[name] = []
+                self.total_samples[name] = 0
+            self._window[name].append(sample)
+            self._pending[name].append(sample)
+            self.total_samples[name] += 1
+        self._pending_count += 1
+        if self._pending_count >= self.chunk_samples:
+            self._spill()
+
+    def _spill(self) -> None:
+        if self._pending_count == 0:
+            return
+        chunk = self._pending
+        self._pending = {f: [] for f in chunk}
+        self._pending_count = 0
+        path = os.path.join(self.spill_dir, f"chunk_{self._n_chunks:05d}.npz")
+        self._n_chunks += 1
+        self._writer.submit(_write_chunk, path, chunk)
+
+    def recent(self) -> Dict[str, List[Tuple[float, float, float]]]:
+        """The in-memory window, in the same shape as raw_time_series."""
+        return {f: list(w) for f, w in self._window.items()}
+
+    def close(self) -> None:
+        """Spill whatever is still pending and wait for all writes."""
+        if self._closed:
+            return
+        self._spill()
+        self._writer.shutdown(wait=True)
+        self._closed = True
+
+    def iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield finger -> (n, 3) array of (t, x, y) rows, one chunk at a time."""
+        self.close()
+        for path in sorted(glob.glob(os.path.join(self.spill_dir, "chunk_*.npz"))):
+            with np.load(path) as data:
+                yield {f: data[f] for f in data.files}
+
+    def cleanup(self) -> None:
+        """Stop the writer thread and delete the spilled chunk files."""
+        self._closed = True
+        self._finalizer()
+
+
+def _remove_spill(writer: ThreadPoolExecutor, spill_dir: str) -> None:
+    writer.shutdown(wait=True)
+    shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+def _write_chunk(path: str, chunk: Dict[str, List[Tuple[float, float, float]]]) -> None:
+    arrays = {f: np.asarray(rows, dtype=np.float64).reshape(-1, 3) for f, rows in chunk.items()}
+    np.savez_compressed(path, **arrays)
+
+
+def _iter_displacements(
+    store: ChunkedTimeSeries,
+    baseline_positions: Dict[str, Tuple[float, float]],
+) -> Iterator[Dict[str, np.ndarray]]:
+    for chunk in store.iter_chunks():
+        out = {}
+        for finger, rows in chunk.items():
+            baseline = baseline_positions.get(finger)
+            if baseline is None or rows.size == 0:
+                continue
+            x0, y0 = baseline
+            out[finger] = np.hypot(rows[:, 1] - x0, rows[:, 2] - y0)
+        yield out
+
+
+def compute_streaming_metrics(
+    store: ChunkedTimeSeries,
+    baseline_positions: Dict[str, Tuple[float, float]],
+) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, float]]:
+    """Tremor, drift and fatigue per finger, streamed over the spilled chunks.
+
+    Definitions match core.signal_processing exactly (RMS over the test;
+    last-10% mean minus first-10% mean; late-half RMS / early-half RMS).
+    The drift and fatigue windows depend on the total sample count, which is
+    known from `store.total_samples`, so one pass over the chunks suffices.
+
+    Returns (tremor, drift, fatigue) dicts.
+    """
+    fingers = list(store.total_samples)
+    n_total = {f: store.total_samples[f] if baseline_positions.get(f) is not None else 0 for f in fingers}
+
+    sum_sq = {f: 0.0 for f in fingers}
+    early_sq = {f: 0.0 for f in fingers}
+    late_sq = {f: 0.0 for f in fingers}
+    head_sum = {f: 0.0 for f in fingers}
+    tail_sum = {f: 0.0 for f in fingers}
+    offset = {f: 0 for f in fingers}
+
+    for chunk in _iter_displacements(store, baseline_positions):
+        for finger, d in chunk.items():
+            n = n_total[finger]
+            k = max(1, n // 10)
+            mid = n // 2
+            idx = offset[finger] + np.arange(len(d))
+            sq = d * d
+
+            sum_sq[finger] += float(sq.sum())
+            early_sq[finger] += float(sq[idx < mid].sum())
+            late_sq[finger] += float(sq[idx >= mid].sum())
+            head_sum[finger] += float(d[idx < k].sum())
+            tail_sum[finger] += float(d[idx >= n - k].sum())
+            offset[finger] += len(d)
+
+    tremor: Dict[str, float] = {}
+    drift: Dict[str, float] = {}
+    fatigue: Dict[str, float] = {}
+    for finger in fingers:
+        n = n_total[finger]
+        tremor[finger] = math.sqrt(sum_sq[finger] / n) if n > 0 else 0.0
+
+        if n < 2:
+            drift[finger] = 0.0
+        else:
+            k = max(1, n // 10)
+            drift[finger] = tail_sum[finger] / k - head_sum[finger] / k
+
+        if n < 4:
+            fatigue[finger] = 1.0
+        else:
+            mid = n // 2
+            rms_early = math.sqrt(early_sq[finger] / mid)
+            rms_late = math.sqrt(late_sq[finger] / (n - mid))
+            fatigue[finger] = 1.0 if rms_early <= 1e-9 else rms_late / rms_early
+
+    return tremor, drift, fatigue
+
+
+def decimated_displacement_series(
+    store: ChunkedTimeSeries,
+    baseline_positions: Dict[str, Tuple[float, float]],
+    max_points: int = config.LONG_PROTOCOL_PLOT_POINTS,
+) -> Dict[str, List[Tuple[float, float]]]:
+    """(t, displacement) per finger, thinned to at most ~`max_points` for plotting."""
+    series: Dict[str, List[Tuple[float, float]]] = {f: [] for f in store.total_samples}
+    offset = {f: 0 for f in store.total_samples}
+    for chunk in store.iter_chunks():
+        for finger, rows in chunk.items():
+            baseline = baseline_positions.get(finger)
+            if baseline is None or rows.size == 0:
+                continue
+            step = max(1, math.ceil(store.total_samples[finger] / max_points))
+            # keep the global sample indices that are multiples of `step`
+            first = (-offset[finger]) % step
+            picked = rows[first::step]
+            x0, y0 = baseline
+            d = np.hypot(picked[:, 1] - x0, picked[:, 2] - y0)
+            series[finger].extend(zip(picked[:, 0].tolist(), d.tolist()))
+            offset[finger] += len(rows)
+    return series
@@ -7,11 +7,16 @@ This module will contain helper functions to:
 - Extract fingertip landmark coordinates for THUMB, INDEX, MIDDLE.
 """
 
-def init_mediapipe_hands():
+def init_mediapipe_hands(
+    model_complexity=1,
+    min_detection_confidence=0.5,
+    min_tracking_confidence=0.5,
+):
     """
-    TODO (AI / TEAM):
-    - Import mediapipe.
-    - Create and return a Hands object configured for real-time video.
+    Create and return (mp, hands), with Hands configured for real-time video.
+
+    The keyword arguments let core.quality_governor trade accuracy for speed
+    (model_complexity=0 is the lighter landmark model).
     """
     try:
         import mediapipe as mp
@@ -19,8 +24,9 @@ def init_mediapipe_hands():
         hands = mp.solutions.hands.Hands(
             static_image_mode=False,
             max_num_hands=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
+            model_complexity=model_complexity,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
         )
 
         return mp, hands
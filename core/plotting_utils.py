@@ -4,7 +4,7 @@
 This module contains helper functions for creating plots of:
 - Fingertip displacement over time
 - Fatigue indices (bar chart)
-- Optional correlation / similarity between fingers
+- Correlation / coherence between fingers (heatmap)
 
 All plotting should be:
 - Simple
@@ -15,7 +15,7 @@ We will generally return matplotlib Figure objects so Streamlit can display
 them with st.pyplot(fig).
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 import matplotlib.pyplot as plt
 
 from core import config
@@ -61,3 +61,51 @@ def plot_displacement_time_series(displacement_ts: Dict[str, List[Tuple[float, f
 
     fig.tight_layout()
     return fig
+
+
+def plot_coordination_heatmap(
+    matrix,
+    labels: Sequence[str],
+    title: str = "Cross-Finger Coordination",
+    vmin: float = -1.0,
+    vmax: float = 1.0,
+    cmap: str = "RdBu_r",
+    value_fmt: Optional[str] = "{:.2f}",
+):
+    """Create a heatmap of a square channel x channel matrix.
+
+    Parameters
+    ----------
+    matrix : array-like, shape (n, n)
+        E.g. the "correlation" or "coherence" entry returned by
+        core.coordination.compute_coordination_metrics.
+    labels : sequence of str
+        Channel names in row/column order (e.g. "THUMB_x").
+    value_fmt : str or None
+        Format for the per-cell annotation. Annotations are skipped for
+        large matrices (more than 12 channels) or when None.
+
+    Returns
+    -------
+    matplotlib.figure.Figure
+    """
+
+    n = len(labels)
+    size = max(3.5, 0.45 * n + 1.5)
+    fig, ax = plt.subplots(figsize=(size, size * 0.85))
+
+    im = ax.imshow(matrix, vmin=vmin, vmax=vmax, cmap=cmap)
+    ax.set_xticks(range(n))
+    ax.set_yticks(range(n))
+    ax.set_xticklabels(labels, rotation=45, ha="right")
+    ax.set_yticklabels(labels)
+    ax.set_title(title)
+
+    if value_fmt and n <= 12:
+        for i in range(n):
+            for j in range(n):
+                ax.text(j, i, value_fmt.format(matrix[i][j]), ha="center", va="center", fontsize=8)
+
+    fig.colorbar(im, ax=ax, fraction=0.046, pad=0.04)
+    fig.tight_layout()
+    return fig
@@ -0,0 +1,145 @@
+# core/presence_gate.py
+
+"""
+Cheap pre-filter that decides whether full MediaPipe inference is worth
+running on a frame.
+
+While no hand has been seen recently, each frame is shrunk to
+`config.PRESENCE_GATE_SIZE` and two masks are built on the tiny image:
+
+- skin: pixels inside a YCrCb skin-tone range
+- motion: pixels whose gray level changed by more than
+  `config.PRESENCE_GATE_PIXEL_DIFF` since the previous tiny frame
+
+MediaPipe runs when the pixels that are both skin-toned and moving cover at
+least `config.PRESENCE_GATE_MOTION_FRACTION` of the frame. Skin alone is not
+enough (a face sits in view the whole test) and motion alone is not either
+(background movement). Three rules keep hands from being missed for long:
+
+- after MediaPipe finds a hand, every frame is processed for
+  `config.PRESENCE_GATE_HOLD_SECONDS`, so a hand held still stays tracked
+  and a single missed detection does not switch the gate back to skipping;
+- a frame with moving skin is always processed;
+- MediaPipe is forced to run at least every
+  `config.PRESENCE_GATE_MAX_SKIP_SECONDS`, which finds a hand that entered
+  the frame and then kept still.
+
+Forced re-checks double as a false-negative probe: if the gate would have
+skipped a frame on which MediaPipe then finds a hand, `false_negatives` is
+incremented. With `enabled=False` the gate never skips but still evaluates
+every frame, so its false-negative rate can be benchmarked against full
+inference.
+"""
+
+from typing import Dict, Optional
+import time
+
+from core import config
+
+# Commonly used YCrCb skin range (Cr 133–173, Cb 77–127).
+_SKIN_LOW = (0, 133, 77)
+_SKIN_HIGH = (255, 173, 127)
+
+
+class HandPresenceGate:
+    def __init__(
+        self,
+        enabled: bool = config.PRESENCE_GATE_ENABLED,
+        size=config.PRESENCE_GATE_SIZE,
+        pixel_diff: int = config.PRESENCE_GATE_PIXEL_DIFF,
+        motion_fraction: float = config.PRESENCE_GATE_MOTION_FRACTION,
+        hold_seconds: float = config.PRESENCE_GATE_HOLD_SECONDS,
+        max_skip_seconds: float = config.PRESENCE_GATE_MAX_SKIP_SECONDS,
+    ):
+        self.enabled = enabled
+        self.size = tuple(size)
+        self.pixel_diff = pixel_diff
+        self.motion_fraction = motion_fraction
+        self.hold_seconds = hold_seconds
+        self.max_skip_seconds = max_skip_seconds
+
+        self._prev_gray = None
+        self._last_run: Optional[float] = None
+        self._last_detection: Optional[float] = None
+        self._pending_time: Optional[float] = None
+        self._pending_would_skip = False
+        self.reset_stats()
+
+    def reset_stats(self) -> None:
+        self.stats: Dict[str, int] = {
+            "frames": 0,            # frames seen by the gate
+            "skipped": 0,           # frames where MediaPipe was not run
+            "forced": 0,            # re-checks forced by max_skip_seconds
+            "would_skip": 0,        # frames the heuristics rejected
+            "false_negatives": 0,   # rejected frames where MediaPipe found a hand
+        }
+
+    def _shrink(self, img):
+        """Tiny BGR frame plus the previous tiny gray frame (None at first)."""
+        import cv2
+
+        tiny = cv2.resize(img, self.size, interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(tiny, cv2.COLOR_BGR2GRAY)
+        prev = self._prev_gray
+        self._prev_gray = gray
+        return tiny, gray, prev
+
+    def _looks_like_hand(self, img) -> bool:
+        import cv2
+
+        tiny, gray, prev = self._shrink(img)
+        if prev is None:
+            return True
+        area = self.size[0] * self.size[1]
+
+        ycrcb = cv2.cvtColor(tiny, cv2.COLOR_BGR2YCrCb)
+        skin = cv2.inRange(ycrcb, _SKIN_LOW, _SKIN_HIGH)
+        motion = cv2.threshold(
+            cv2.absdiff(gray, prev), self.pixel_diff, 255, cv2.THRESH_BINARY
+        )[1]
+        # Fraction of moving skin pixels, so a small hand moving in a large
+        # static frame still counts (a global mean would average it away).
+        moving_skin = cv2.countNonZero(cv2.bitwise_and(skin, motion))
+        return moving_skin >= self.motion_fraction * area
+
+    def should_run(self, img, now: Optional[float] = None) -> bool:
+        """Return True if MediaPipe should process this BGR frame.
+
+        Must be followed by `record_result` whenever it returns True.
+        """
+        if now is None:
+            now = time.monotonic()
+        self.stats["frames"] += 1
+        self._pending_time = now
+
+        if self._last_detection is not None and now - self._last_detection < self.hold_seconds:
+            # Hand seen recently: only keep the motion reference frame fresh.
+            self._shrink(img)
+            self._pending_would_skip = False
+            self._last_run = now
+            return True
+
+        would_skip = not self._looks_like_hand(img)
+        if would_skip:
+            self.stats["would_skip"] += 1
+        self._pending_would_skip = would_skip
+
+        if not self.enabled or not would_skip:
+            self._last_run = now
+            return True
+
+        if self._last_run is None or now - self._last_run >= self.max_skip_seconds:
+            self.stats["forced"] += 1
+            self._last_run = now
+            return True
+
+        self.stats["skipped"] += 1
+        return False
+
+    def record_result(self, hand_found: bool) -> None:
+        """Tell the gate whether MediaPipe found a hand on the last run frame."""
+        if hand_found:
+            if self._pending_would_skip:
+                self.stats["false_negatives"] += 1
+            self._last_detection = self._pending_time
+        self._pending_would_skip = False
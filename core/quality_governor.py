@@ -0,0 +1,112 @@
+# core/quality_governor.py
+
+"""
+Feedback controller that keeps per-session MediaPipe processing within a
+frame-rate / latency budget when the server is under CPU load.
+
+The governor walks up and down `config.QUALITY_LEVELS`. Each level sets the
+MediaPipe `model_complexity`, the inference resolution and how many incoming
+frames are processed (`process_every_n`). After every processed frame the caller reports how long
+processing took; the governor smooths this and, at most once per
+`config.QUALITY_ADJUST_INTERVAL_SECONDS`, steps to a cheaper level when over
+budget or back to a better one when there is clear headroom.
+
+Every level change is logged (logger "core.quality_governor") and kept in
+`decisions` so it can be shown next to the results.
+"""
+
+from typing import Dict, List, Optional
+import logging
+import time
+
+from core import config
+
+logger = logging.getLogger(__name__)
+
+
+class QualityGovernor:
+    def __init__(
+        self,
+        levels: Optional[List[Dict]] = None,
+        latency_budget_ms: float = config.QUALITY_LATENCY_BUDGET_MS,
+        adjust_interval: float = config.QUALITY_ADJUST_INTERVAL_SECONDS,
+        upgrade_headroom: float = config.QUALITY_UPGRADE_HEADROOM,
+        smoothing: float = 0.2,
+    ):
+        self.levels = levels if levels is not None else config.QUALITY_LEVELS
+        self.latency_budget_ms = latency_budget_ms
+        self.adjust_interval = adjust_interval
+        self.upgrade_headroom = upgrade_headroom
+        self.smoothing = smoothing
+
+        self.level = 0
+        self.latency_ms: Optional[float] = None  # smoothed processing latency
+        self.frames_seen = 0
+        self.frames_processed = 0
+        self.decisions: List[Dict] = []
+        self._last_change: Optional[float] = None
+
+    @property
+    def settings(self) -> Dict:
+        return self.levels[self.level]
+
+    def should_process(self) -> bool:
+        """Call once per incoming frame; False means skip this frame."""
+        self.frames_seen += 1
+        return (self.frames_seen - 1) % self.settings["process_every_n"] == 0
+
+    def inference_size(self, width: int, height: int):
+        """(w, h) to resize a frame to before inference, or None for full size."""
+        target = self.settings["inference_width"]
+        if target is None or width <= target:
+            return None
+        return target, max(1, int(round(height * target / width)))
+
+    def report(self, latency_s: float, now: Optional[float] = None) -> bool:
+        """Record one processed frame's latency. Returns True if the level changed."""
+        if now is None:
+            now = time.monotonic()
+        self.frames_processed += 1
+        ms = latency_s * 1000.0
+        if self.latency_ms is None:
+            self.latency_ms = ms
+        else:
+            self.latency_ms += self.smoothing * (ms - self.latency_ms)
+
+        if self._last_change is None:
+            # Give the first settings a full interval before judging them.
+            self._last_change = now
+        if now - self._last_change < self.adjust_interval:
+            return False
+
+        if self.latency_ms > self.latency_budget_ms and self.level < len(self.levels) - 1:
+            return self._change(self.level + 1, "over latency budget", now)
+        # Stepping up is slower than stepping down so the governor does not
+        # flap between two levels on a busy box.
+        if (
+            self.latency_ms < self.latency_budget_ms * self.upgrade_headroom
+            and self.level > 0
+            and now - self._last_change >= 3 * self.adjust_interval
+        ):
+            return self._change(self.level - 1, "latency headroom", now)
+        return False
+
+    def _change(self, new_level: int, reason: str, now: float) -> bool:
+        decision = {
+            "time": now,
+            "from_level": self.level,
+            "to_level": new_level,
+            "reason": reason,
+            "latency_ms": self.latency_ms,
+            "settings": dict(self.levels[new_level]),
+        }
+        logger.info(
+            "quality level %d -> %d (%s, smoothed latency %.1f ms, budget %.1f ms): %s",
+            self.level, new_level, reason, self.latency_ms, self.latency_budget_ms,
+            self.levels[new_level],
+        )
+        self.decisions.append(decision)
+        self.level = new_level
+        self._last_change = now
+        self.latency_ms = None  # measure the new settings from scratch
+        return True
@@ -0,0 +1,218 @@
+# core/session_recorder.py
+
+"""
+Optional recorder for raw Live Test data (video frames + landmark samples),
+kept for audits and later reanalysis.
+
+The media thread only ever calls the non-blocking `add_frame` /
+`add_landmarks` methods. All encoding and disk I/O happens on a background
+writer thread that drains two bounded queues:
+
+- Frames: if the disk cannot keep up and the frame queue is full, the NEWEST
+  frame is dropped (counted in `stats["frames_dropped"]`). The live preview is
+  never delayed.
+- Landmarks: rows are batched into chunks of
+  `config.RECORDING_LANDMARK_CHUNK_SIZE` and flushed to CSV per chunk. Chunks
+  are tiny, but if that queue ever fills up the chunk is dropped and counted
+  in `stats["landmark_rows_dropped"]`.
+
+Files written to `<output_dir>/<session_id>/`:
+- video.avi        MJPEG video at `config.RECORDING_VIDEO_QUALITY`
+- frames.csv       frame_index,t  (true capture time of each written frame)
+- landmarks.csv    t,finger,x,y
+- stats.json       final queue / write / drop counters (written by stop())
+"""
+
+from typing import Dict, List, Optional, Tuple
+import csv
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+
+from core import config
+
+
+class SessionRecorder:
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        output_dir: str = config.RECORDINGS_DIR,
+        fps: float = config.RECORDING_VIDEO_FPS,
+        quality: int = config.RECORDING_VIDEO_QUALITY,
+        frame_queue_size: int = config.RECORDING_FRAME_QUEUE_SIZE,
+        landmark_chunk_size: int = config.RECORDING_LANDMARK_CHUNK_SIZE,
+    ):
+        if session_id is None:
+            # The random suffix keeps recordings started in the same second
+            # (e.g. by two users) in separate directories.
+            session_id = time.strftime("session_%Y%m%d_%H%M%S_") + uuid.uuid4().hex[:8]
+        self.session_id = session_id
+        self.path = os.path.join(output_dir, session_id)
+        self.fps = fps
+        self.quality = quality
+        self.landmark_chunk_size = landmark_chunk_size
+
+        self._frame_q: "queue.Queue[Tuple[float, object]]" = queue.Queue(maxsize=frame_queue_size)
+        self._landmark_q: "queue.Queue[List[Tuple[float, str, float, float]]]" = queue.Queue(maxsize=64)
+        self._pending_rows: List[Tuple[float, str, float, float]] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Guards _pending_rows and stats: producers (media thread) and stop()
+        # (often on another thread) both touch them.
+        self._lock = threading.Lock()
+
+        self.stats: Dict[str, int] = {
+            "frames_queued": 0,
+            "frames_written": 0,
+            "frames_dropped": 0,
+            "landmark_rows_queued": 0,
+            "landmark_rows_written": 0,
+            "landmark_rows_dropped": 0,
+            "write_errors": 0,
+        }
+
+    # ---- producer side (called from the media thread) ----
+
+    def start(self) -> "SessionRecorder":
+        if self._thread is not None:
+            return self
+        # exist_ok=False: never let two recorders write into one directory.
+        os.makedirs(self.path, exist_ok=False)
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and not self._stop_event.is_set()
+
+    def add_frame(self, img, t: float) -> bool:
+        """Queue a BGR frame captured at time `t`. Never blocks.
+
+        The caller must not modify `img` afterwards (pass a copy if the frame
+        is annotated for display). Returns False if the frame was dropped.
+        """
+        with self._lock:
+            if not self.running:
+                return False
+            try:
+                self._frame_q.put_nowait((t, img))
+            except queue.Full:
+                self.stats["frames_dropped"] += 1
+                return False
+            self.stats["frames_queued"] += 1
+            return True
+
+    def add_landmarks(self, t: float, landmarks: Dict[str, Tuple[float, float]]) -> None:
+        """Buffer one landmark sample (finger -> (x, y)) taken at time `t`."""
+        with self._lock:
+            if not self.running:
+                return
+            for finger, (x, y) in landmarks.items():
+                self._pending_rows.append((t, finger, x, y))
+            if len(self._pending_rows) >= self.landmark_chunk_size:
+                self._push_landmark_chunk_locked()
+
+    def _push_landmark_chunk_locked(self) -> None:
+        if not self._pending_rows:
+            return
+        chunk = self._pending_rows
+        self._pending_rows = []
+        try:
+            self._landmark_q.put_nowait(chunk)
+            self.stats["landmark_rows_queued"] += len(chunk)
+        except queue.Full:
+            self.stats["landmark_rows_dropped"] += len(chunk)
+
+    def snapshot_stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.stats)
+
+    def stop(self, timeout: float = 10.0) -> Dict[str, int]:
+        """Flush remaining data, close files and return the final stats.
+
+        The final stats are also written to `<path>/stats.json`.
+        """
+        if self._thread is None:
+            return self.snapshot_stats()
+        with self._lock:
+            # Once the event is set, producers holding a reference to this
+            # recorder see running == False and add nothing more, so the
+            # final flush cannot race with add_landmarks.
+            self._stop_event.set()
+            self._push_landmark_chunk_locked()
+        self._thread.join(timeout)
+        self._thread = None
+
+        stats = self.snapshot_stats()
+        try:
+            with open(os.path.join(self.path, "stats.json"), "w") as f:
+                json.dump(stats, f, indent=2)
+        except OSError:
+            pass
+        return stats
+
+    # ---- consumer side (writer thread) ----
+
+    def _open_video_writer(self, img):
+        import cv2
+
+        h, w = img.shape[:2]
+        fourcc = cv2.VideoWriter_fourcc(*"MJPG")
+        writer = cv2.VideoWriter(os.path.join(self.path, "video.avi"), fourcc, self.fps, (w, h))
+        if hasattr(cv2, "VIDEOWRITER_PROP_QUALITY"):
+            writer.set(cv2.VIDEOWRITER_PROP_QUALITY, float(self.quality))
+        return writer
+
+    def _writer_loop(self) -> None:
+        video = None
+        frames_written = 0
+        frames_f = open(os.path.join(self.path, "frames.csv"), "w", newline="")
+        landmarks_f = open(os.path.join(self.path, "landmarks.csv"), "w", newline="")
+        frames_csv = csv.writer(frames_f)
+        landmarks_csv = csv.writer(landmarks_f)
+        frames_csv.writerow(["frame_index", "t"])
+        landmarks_csv.writerow(["t", "finger", "x", "y"])
+
+        def drain_landmarks() -> None:
+            while True:
+                try:
+                    chunk = self._landmark_q.get_nowait()
+                except queue.Empty:
+                    return
+                landmarks_csv.writerows(chunk)
+                landmarks_f.flush()
+                with self._lock:
+                    self.stats["landmark_rows_written"] += len(chunk)
+
+        try:
+            while True:
+                drain_landmarks()
+                try:
+                    t, img = self._frame_q.get(timeout=0.05)
+                except queue.Empty:
+                    if self._stop_event.is_set():
+                        break
+                    continue
+
+                try:
+                    if video is None:
+                        video = self._open_video_writer(img)
+                    video.write(img)
+                    frames_csv.writerow([frames_written, f"{t:.6f}"])
+                    frames_written += 1
+                    with self._lock:
+                        self.stats["frames_written"] = frames_written
+                except Exception:
+                    with self._lock:
+                        self.stats["write_errors"] += 1
+
+            drain_landmarks()
+        finally:
+            if video is not None:
+                video.release()
+            frames_f.close()
+            landmarks_f.close()
@@ -1,7 +1,13 @@
 import streamlit as st
 from core import config
 from core import mediapipe_utils
+from core.live_session import LiveTestSession
+from core.long_protocol import ChunkedTimeSeries
+from core.presence_gate import HandPresenceGate
+from core.quality_governor import QualityGovernor
+from core.session_recorder import SessionRecorder
 import cv2
+import threading
 import time
 import numpy as np
 import tempfile
@@ -22,7 +28,8 @@ st.markdown(
     Hold your hand in the **same position** as during calibration.
 
     We will record **{config.TEST_DURATION_SECONDS} seconds** of fingertip motion
-    to estimate tremor, drift, and fatigue.
+    to estimate tremor, drift, and fatigue (or longer, with the long fatigue
+    protocol option).
     """
 )
 
@@ -47,37 +54,112 @@ with col1:
 
     class HandTrackingTransformer(VideoTransformerBase):
         def __init__(self):
-            self.mp, self.hands = mediapipe_utils.init_mediapipe_hands()
-            self.start_time = None
+            self.governor = QualityGovernor()
+            self.gate = HandPresenceGate()
+            self._hands_lock = threading.Lock()
+            self._hands_complexity = self.governor.settings["model_complexity"]
+            self.mp, self.hands = mediapipe_utils.init_mediapipe_hands(
+                model_complexity=self._hands_complexity
+            )
+            self._wanted_complexity = self._hands_complexity
+            self._next_hands = None
             self.last_detected = False
             self.idx_map = {"THUMB": 4, "INDEX": 8, "MIDDLE": 12}
+            # Set from the script thread when a test starts.
+            self.live_session = None
+
+        def _ensure_hands(self):
+            """Follow the governor's model_complexity with a new Hands instance.
+
+            Loading a model takes long enough to stall the stream, so it is
+            built on a helper thread; the media thread keeps using the current
+            instance until `_swap_hands` picks up the new one.
+            """
+            complexity = self.governor.settings["model_complexity"]
+            with self._hands_lock:
+                if complexity == self._wanted_complexity:
+                    return
+                self._wanted_complexity = complexity
+                stale, self._next_hands = self._next_hands, None
+            if stale is not None:
+                stale[2].close()
+            if complexity != self._hands_complexity:
+                threading.Thread(
+                    target=self._build_hands, args=(complexity,), daemon=True
+                ).start()
+
+        def _build_hands(self, complexity):
+            mp, hands = mediapipe_utils.init_mediapipe_hands(model_complexity=complexity)
+            with self._hands_lock:
+                if complexity != self._wanted_complexity:
+                    stale = hands  # superseded by a later level change
+                else:
+                    stale = None
+                    self._next_hands = (complexity, mp, hands)
+            if stale is not None:
+                stale.close()
+
+        def _swap_hands(self):
+            """Media thread only: switch to a Hands built by `_build_hands`."""
+            if self._next_hands is None:
+                return
+            with self._hands_lock:
+                ready, self._next_hands = self._next_hands, None
+            if ready is None:
+                return
+            old = self.hands
+            self._hands_complexity, self.mp, self.hands = ready
+            old.close()
 
         def recv(self, frame):
             import av
 
             img = frame.to_ndarray(format="bgr24")
-            stats = st.session_state.get("detection_stats")
-            if stats is None:
-                stats = {"frames": 0, "detected": 0}
-                st.session_state["detection_stats"] = stats
-
-            if st.session_state.get("webrtc_capturing"):
-                if self.start_time is None:
-                    self.start_time = time.time()
-                t = time.time() - self.start_time
-
-                rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                results = self.hands.process(rgb)
-                stats["frames"] += 1
-                if results.multi_hand_landmarks:
-                    stats["detected"] += 1
-                    self.last_detected = True
-                    lms = results.multi_hand_landmarks[0]
-                    for name, idx in self.idx_map.items():
-                        lm = lms.landmark[idx]
-                        st.session_state["raw_time_series"][name].append((t, lm.x, lm.y))
-                else:
+            session = self.live_session
+            self._swap_hands()
+
+            if session is not None and session.poll():
+                t = session.elapsed()
+
+                recorder = session.recorder
+                if recorder is not None:
+                    # copy: the preview below draws on img in place
+                    recorder.add_frame(img.copy(), t)
+
+                # The governor may skip frames under load, and the presence
+                # gate skips frames that cannot contain a hand (the recorder
+                # above still gets every frame).
+                governed = self.governor.should_process()
+                if governed and not self.gate.should_run(img):
+                    # counted as a frame without landmarks
                     self.last_detected = False
+                    session.add_gated(t)
+                elif governed:
+                    proc_start = time.perf_counter()
+                    small = img
+                    size = self.governor.inference_size(img.shape[1], img.shape[0])
+                    if size is not None:
+                        # landmarks are normalized, so a downscaled frame is fine
+                        small = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+                    rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
+                    results = self.hands.process(rgb)
+                    sample = None
+                    if results.multi_hand_landmarks:
+                        self.last_detected = True
+                        lms = results.multi_hand_landmarks[0]
+                        sample = {}
+                        for name, idx in self.idx_map.items():
+                            lm = lms.landmark[idx]
+                            sample[name] = (lm.x, lm.y)
+                        if recorder is not None:
+                            recorder.add_landmarks(t, sample)
+                    else:
+                        self.last_detected = False
+                    self.gate.record_result(sample is not None)
+                    session.add_sample(t, sample)
+
+                    if self.governor.report(time.perf_counter() - proc_start):
+                        self._ensure_hands()
 
             status_text = "HAND DETECTED" if self.last_detected else "No hand detected"
             color = (0, 200, 0) if self.last_detected else (0, 0, 200)
@@ -102,7 +184,7 @@ with col1:
             "video": {
                 "width": {"ideal": 1280},
                 "height": {"ideal": 720},
-                "frameRate": {"ideal": 30},
+                "frameRate": {"ideal": config.QUALITY_TARGET_FPS},
                 "facingMode": "user",
             },
             "audio": False,
@@ -112,37 +194,184 @@ with col1:
 with col2:
     st.subheader("Test Control & Status")
 
-    stats = st.session_state.get("detection_stats", {"frames": 0, "detected": 0})
-    detected_ratio = (
-        stats["detected"] / stats["frames"] * 100 if stats["frames"] > 0 else 0.0
-    )
-    st.caption(
-        f"Detection confidence: {stats['detected']} / {stats['frames']} frames "
-        f"({detected_ratio:.1f}% with landmarks)"
+    record_session = st.checkbox(
+        "Record raw video & landmarks for later reanalysis",
+        value=False,
+        help=f"Saved under '{config.RECORDINGS_DIR}/'. Frames are dropped "
+        "(and counted) rather than slowing down the live preview.",
     )
 
-    if st.button("▶ Start 30s Test"):
+    long_protocol = st.checkbox(
+        "Long fatigue protocol",
+        value=False,
+        help="Keeps only a recent window in memory and spills older samples "
+        "to compressed files on disk.",
+    )
+    if long_protocol:
+        long_minutes = st.selectbox(
+            "Protocol length (minutes)", config.LONG_PROTOCOL_DURATION_CHOICES_MINUTES
+        )
+        duration = long_minutes * 60
+        start_label = f"▶ Start {long_minutes} min Protocol"
+    else:
         duration = config.TEST_DURATION_SECONDS
+        start_label = f"▶ Start {duration}s Test"
+
+    use_presence_gate = st.checkbox(
+        "Skip hand tracking on empty frames (presence gate)",
+        value=config.PRESENCE_GATE_ENABLED,
+        help="A cheap motion / skin-tone check decides whether MediaPipe runs "
+        f"while no hand is visible; it still re-checks every "
+        f"{config.PRESENCE_GATE_MAX_SKIP_SECONDS:g} s. Turn off to benchmark "
+        "how often the gate would have missed a hand.",
+    )
+    if webrtc_ctx and webrtc_ctx.video_transformer is not None:
+        webrtc_ctx.video_transformer.gate.enabled = use_presence_gate
 
-        if not webrtc_ctx or not webrtc_ctx.state.playing:
+    if st.button(start_label):
+        if not webrtc_ctx or not webrtc_ctx.state.playing or webrtc_ctx.video_transformer is None:
             st.error("WebRTC stream is not active. Make sure the webcam stream above is running.")
             st.stop()
 
-        # reset previous data
+        # stop any previous run and reset data
+        previous = st.session_state.get("live_session")
+        if previous is not None:
+            previous.finish()
+            if previous.store is not None:
+                # restarted or abandoned long protocol: drop its spill files
+                previous.store.cleanup()
+        old_store = st.session_state.pop("long_protocol_store", None)
+        if old_store is not None:
+            old_store.cleanup()
         st.session_state["raw_time_series"] = {f: [] for f in config.FINGERS_TO_TRACK}
         st.session_state["detection_stats"] = {"frames": 0, "detected": 0}
-        st.session_state["webrtc_capturing"] = True
+        st.session_state["test_complete"] = False
+        st.session_state["recording_stats"] = None
+        st.session_state["recording_path"] = None
 
-        with st.spinner(f"Recording via browser webcam for {duration} seconds..."):
-            start = time.time()
-            while time.time() - start < duration:
-                time.sleep(0.1)
+        session = LiveTestSession(
+            duration=duration,
+            recorder=SessionRecorder().start() if record_session else None,
+            store=ChunkedTimeSeries() if long_protocol else None,
+        )
+        st.session_state["live_session"] = session
+        webrtc_ctx.video_transformer.gate.reset_stats()
+        session.quality_decision_offset = len(webrtc_ctx.video_transformer.governor.decisions)
+        webrtc_ctx.video_transformer.live_session = session.start()
 
-        st.session_state["webrtc_capturing"] = False
+    # Only poll while a test is running; idle and finished pages cost nothing.
+    active_session = st.session_state.get("live_session")
+    status_refresh = (
+        config.LIVE_TEST_REFRESH_SECONDS
+        if active_session is not None and active_session.capturing
+        else None
+    )
+
+    @st.fragment(run_every=status_refresh)
+    def test_status():
+        # While a test runs this reruns on its own every few hundred ms; only
+        # this fragment is redrawn and nothing blocks the script thread
+        # between refreshes. Completion switches page (a full rerun), which
+        # also stops the timer.
+        session = st.session_state.get("live_session")
+
+        if session is None or not (session.capturing or session.complete):
+            stats = st.session_state.get("detection_stats", {"frames": 0, "detected": 0})
+            detected_ratio = (
+                stats["detected"] / stats["frames"] * 100 if stats["frames"] > 0 else 0.0
+            )
+            st.caption(
+                f"Detection confidence: {stats['detected']} / {stats['frames']} frames "
+                f"({detected_ratio:.1f}% with landmarks)"
+            )
+            return
+
+        # Ends the test even if frames stopped arriving.
+        session.poll()
+        snap = session.snapshot()
+
+        if session.capturing:
+            st.progress(
+                min(1.0, snap["elapsed"] / session.duration),
+                text=f"Recording… {snap['elapsed']:.0f} / {session.duration:.0f} s",
+            )
+            m1, m2 = st.columns(2)
+            m1.metric("Detection rate", f"{snap['detection_rate']:.1f}%")
+            m2.metric("Processed fps", f"{snap['fps']:.1f}")
+            transformer = webrtc_ctx.video_transformer if webrtc_ctx else None
+            if transformer is not None and transformer.governor.latency_ms is not None:
+                gov = transformer.governor
+                st.caption(
+                    f"Quality level {gov.level} / {len(gov.levels) - 1} · "
+                    f"processing {gov.latency_ms:.0f} ms (budget {gov.latency_budget_ms:.0f} ms)"
+                )
+            if transformer is not None:
+                gate_stats = transformer.gate.stats
+                st.caption(
+                    f"Presence gate: {gate_stats['skipped']} / {gate_stats['frames']} "
+                    f"frames skipped, {gate_stats['false_negatives']} gate misses"
+                )
+            st.caption(
+                f"{snap['detected']} / {snap['frames']} frames with landmarks "
+                f"({snap['gated']} skipped by the presence gate)"
+            )
+            recorder = session.recorder
+            if recorder is not None:
+                live_rec = recorder.snapshot_stats()
+                st.caption(
+                    f"Recording: {live_rec['frames_queued']} frames queued, "
+                    f"{live_rec['frames_dropped']} dropped; "
+                    f"{live_rec['landmark_rows_dropped']} landmark rows dropped"
+                )
+            return
+
+        if not st.session_state.get("test_complete"):
+            if session.store is not None:
+                # Results streams the full protocol from disk; only the
+                # recent window is kept in session state.
+                st.session_state["long_protocol_store"] = session.store
+                st.session_state["raw_time_series"] = session.store.recent()
+            else:
+                st.session_state["raw_time_series"] = session.raw_time_series
+            st.session_state["detection_stats"] = session.detection_stats
+            # Frames per second the quality governor let through, so the
+            # metrics can account for throttling. Presence-gate skips are not
+            # subtracted (no hand = no samples either way); they are reported
+            # separately.
+            st.session_state["effective_sample_rate"] = snap["fps"]
+            st.session_state["inference_rate"] = snap["inference_fps"]
+            transformer = webrtc_ctx.video_transformer if webrtc_ctx else None
+            st.session_state["quality_decisions"] = (
+                transformer.governor.decisions[session.quality_decision_offset:]
+                if transformer is not None
+                else []
+            )
+            st.session_state["presence_gate_stats"] = (
+                dict(transformer.gate.stats) if transformer is not None else None
+            )
+            # Blocks only for the final recorder flush, on the script thread.
+            st.session_state["recording_stats"] = session.wait_for_recording()
+            st.session_state["recording_path"] = session.recording_path
+            st.session_state["test_complete"] = True
+            st.switch_page("pages/3_Results.py")
+
+        st.caption(
+            f"Detection confidence: {snap['detected']} / {snap['frames']} frames "
+            f"({snap['detection_rate']:.1f}% with landmarks, "
+            f"{snap['gated']} skipped by the presence gate)"
+        )
+        rec_stats = session.recording_stats
+        if rec_stats:
+            st.caption(
+                f"Recording saved to `{session.recording_path}`: "
+                f"{rec_stats['frames_written']} frames written, "
+                f"{rec_stats['frames_dropped']} dropped; "
+                f"{rec_stats['landmark_rows_written']} landmark rows written, "
+                f"{rec_stats['landmark_rows_dropped']} dropped."
+            )
 
-        st.session_state["test_complete"] = True
-        st.success("Test complete using browser webcam stream.")
+    test_status()
 
     if st.session_state.get("test_complete"):
         st.success("Test complete! Proceed to the Results page.")
-        st.caption("Use the sidebar to go to '3_Results'.")
\ No newline at end of file
+        st.caption("Use the sidebar to go to '3_Results'.")
@@ -1,6 +1,6 @@
 import streamlit as st
 from core import config
-from core import signal_processing, scoring, plotting_utils
+from core import signal_processing, scoring, plotting_utils, coordination, long_protocol
 
 st.set_page_config(page_title="Results", page_icon="📈", layout="wide")
 
@@ -17,10 +17,16 @@ if not raw_data:
     st.error("No raw time series data found. Please rerun the Live Test.")
     st.stop()
 
-displacement = signal_processing.compute_displacement_time_series(raw_data, baseline)
-tremor = signal_processing.compute_tremor_metrics(displacement)
-drift = signal_processing.compute_drift_metrics(displacement)
-fatigue = signal_processing.compute_fatigue_metrics(displacement)
+store = st.session_state.get("long_protocol_store")
+if store is not None:
+    # Long protocol: stream the spilled chunks instead of loading everything.
+    tremor, drift, fatigue = long_protocol.compute_streaming_metrics(store, baseline)
+    displacement = long_protocol.decimated_displacement_series(store, baseline)
+else:
+    displacement = signal_processing.compute_displacement_time_series(raw_data, baseline)
+    tremor = signal_processing.compute_tremor_metrics(displacement)
+    drift = signal_processing.compute_drift_metrics(displacement)
+    fatigue = signal_processing.compute_fatigue_metrics(displacement)
 
 score_info = scoring.compute_stability_score(tremor, drift, fatigue)
 
@@ -45,6 +51,45 @@ with col3:
 with col4:
     st.metric("Stability Score", f"{score_info['score']:.1f}", "0–100")
 
+effective_fs = st.session_state.get("effective_sample_rate")
+if effective_fs:
+    inference_fs = st.session_state.get("inference_rate")
+    caption = f"Effective sample rate: {effective_fs:.1f} frames/s after quality throttling"
+    if inference_fs is not None:
+        caption += f" (MediaPipe ran at {inference_fs:.1f} frames/s)"
+    st.caption(caption + ".")
+
+gate_stats = st.session_state.get("presence_gate_stats")
+if gate_stats and gate_stats["frames"] > 0:
+    st.caption(
+        f"Presence gate skipped {gate_stats['skipped']} of {gate_stats['frames']} frames "
+        f"({gate_stats['forced']} forced re-checks); "
+        f"MediaPipe found a hand on {gate_stats['false_negatives']} frames the gate had "
+        "rejected (checked on forced re-checks, or on every frame with the gate off)."
+    )
+
+rec_stats = st.session_state.get("recording_stats")
+if rec_stats:
+    st.caption(
+        f"Recording saved to `{st.session_state.get('recording_path')}`: "
+        f"{rec_stats['frames_written']} frames written, "
+        f"{rec_stats['frames_dropped']} dropped; "
+        f"{rec_stats['landmark_rows_written']} landmark rows written, "
+        f"{rec_stats['landmark_rows_dropped']} dropped (see stats.json)."
+    )
+
+decisions = st.session_state.get("quality_decisions") or []
+if decisions:
+    with st.expander(f"Processing quality changes during the test ({len(decisions)})"):
+        for d in decisions:
+            lvl = d["settings"]
+            st.markdown(
+                f"- Level {d['from_level']} → {d['to_level']} ({d['reason']}, "
+                f"{d['latency_ms']:.0f} ms): model {lvl['model_complexity']}, "
+                f"width {lvl['inference_width'] or 'full'}, "
+                f"every {lvl['process_every_n']} frame(s)"
+            )
+
 st.divider()
 
 st.subheader("Displacement Over Time")
@@ -63,6 +108,60 @@ for i, finger in enumerate(config.FINGERS_TO_TRACK):
     with fat_cols[i]:
         st.metric(finger.title(), f"{val:.2f}")
 
+coord_fs = config.COORDINATION_RESAMPLE_HZ
+if effective_fs:
+    # Don't resample above the rate frames were actually processed at.
+    coord_fs = min(coord_fs, effective_fs)
+coord = coordination.compute_coordination_metrics(raw_data, fs=coord_fs)
+if coord is None:
+    st.info("Not enough overlapping samples to estimate cross-finger coordination.")
+else:
+    band_lo, band_hi = coord["band"]
+    if band_hi < config.COORDINATION_BAND_HZ[1]:
+        st.warning(
+            f"Sample rate {coord_fs:.1f} Hz only resolves up to {band_hi:.1f} Hz, so "
+            f"coherence covers {band_lo:.0f}–{band_hi:.1f} Hz instead of the full "
+            f"{config.COORDINATION_BAND_HZ[0]:.0f}–{config.COORDINATION_BAND_HZ[1]:.0f} Hz "
+            "tremor band."
+        )
+    if store is not None:
+        st.caption("Long protocol: coordination uses the most recent in-memory window.")
+    st.markdown(
+        "Coordination between fingertip x/y channels: zero-lag correlation and "
+        f"coherence in the {band_lo:.0f}–{band_hi:.1f} Hz tremor band "
+        "(values near 1 mean the fingers shake together)."
+    )
+    coord_cols = st.columns(2)
+    with coord_cols[0]:
+        fig_corr = plotting_utils.plot_coordination_heatmap(
+            coord["correlation"], coord["labels"], title="Correlation"
+        )
+        st.pyplot(fig_corr, use_container_width=True)
+    with coord_cols[1]:
+        fig_coh = plotting_utils.plot_coordination_heatmap(
+            coord["coherence"], coord["labels"], title="Tremor-band Coherence",
+            vmin=0.0, vmax=1.0, cmap="viridis",
+        )
+        st.pyplot(fig_coh, use_container_width=True)
+    st.caption(
+        "Phase lead comes from the cross-spectral phase at each pair's dominant "
+        "tremor frequency; a positive lag means the row finger moves first. "
+        "A phase is only defined within one period, so lags are shown within "
+        "± half a period; a phase near ±180° means the pair moves in anti-phase."
+    )
+    with st.expander("Lag and phase matrices"):
+        max_lag = 0.5 / band_lo
+        fig_lag = plotting_utils.plot_coordination_heatmap(
+            coord["lag_seconds"], coord["labels"], title="Lag (s)",
+            vmin=-max_lag, vmax=max_lag, value_fmt="{:.3f}",
+        )
+        st.pyplot(fig_lag, use_container_width=True)
+        fig_phase = plotting_utils.plot_coordination_heatmap(
+            coord["phase_deg"], coord["labels"], title="Phase (deg)",
+            vmin=-180.0, vmax=180.0, value_fmt="{:.0f}",
+        )
+        st.pyplot(fig_phase, use_container_width=True)
+
 st.divider()
 
 st.subheader("Clinical-Style Interpretation")
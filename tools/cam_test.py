@@ -1,33 +1,34 @@
 import cv2
-import time
+import os
+import sys
 
-print("Starting webcam probe (indices 0-3)...")
-found = False
-for idx in range(4):
-    print(f"Trying camera index {idx}...")
-    cap = cv2.VideoCapture(idx)
-    # small delay to allow device to initialize
-    time.sleep(0.5)
-    if not cap.isOpened():
-        print(f"  index {idx}: not opened")
-        cap.release()
-        continue
-    # try to read a frame
-    ret, frame = cap.read()
-    if not ret or frame is None:
-        print(f"  index {idx}: opened but failed to read frame")
-        cap.release()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core import config
+from core.camera_utils import discover_cameras
+
+indices = config.CAMERA_PROBE_INDICES
+print(f"Starting parallel webcam probe (indices {indices[0]}-{indices[-1]})...")
+report = discover_cameras(indices)
+
+working = []
+for info in report:
+    idx = info["index"]
+    if not info["ok"]:
+        print(f"  index {idx}: {info['error']}")
         continue
-    h, w = frame.shape[:2]
-    print(f"  index {idx}: success — frame size {w}x{h}")
+    print(
+        f"  index {idx}: success — frame size {info['width']}x{info['height']}, "
+        f"~{info['fps']:.1f} fps"
+    )
     fname = f"cam_test_{idx}.jpg"
-    cv2.imwrite(fname, frame)
+    cv2.imwrite(fname, info["frame"])
     print(f"  saved test frame to {fname}")
-    found = True
-    cap.release()
-    break
+    working.append(idx)
 
-if not found:
-    print("No working camera found at indices 0-3.")
+if not working:
+    print(f"No working camera found at indices {indices[0]}-{indices[-1]}.")
+else:
+    print(f"Working cameras: {working}")
 
 print("Probe complete.")